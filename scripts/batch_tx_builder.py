@@ -9,8 +9,8 @@ The XRP Ledger added support for atomic batch transactions (XLS‑56) in 2025. A
 batch can contain up to eight unsigned inner transactions that are all
 executed together.  If any inner transaction fails, the whole batch fails
 depending on the batch mode.  This allows developers to combine
-decentralized identifier (DID) setup, credential acceptance and dynamic
-NFT minting in a single atomic unit.
+decentralized identifier (DID) setup, credential issuance and acceptance
+and dynamic NFT minting in a single atomic unit.
 
 The functions in this file use the `xrpl‑py` client library to assemble
 transactions.  To actually submit them to a network you must provide a
@@ -35,6 +35,10 @@ Important protocol details used here include:
   account.  At least one of `URI`, `Data` or `DIDDocument` must be
   provided【996088701624246†L265-L297】.
 
+The `build_*` helpers produce inner transactions only: each sets the
+`tfInnerBatchTxn` flag (`0x40000000`), which rippled rejects outside a
+Batch, so their output must be wrapped with `build_batch_tx`.
+
 Because dynamic NFT minting, credential acceptance and DID creation
 require separate signatures, this sample assumes that you control the
 private keys for both the issuer and the nurse accounts.  In a
@@ -48,19 +52,27 @@ Usage Example
 from xrpl.wallet import Wallet
 from batch_tx_builder import (
     build_didset_tx,
+    build_credential_create_tx,
     build_credential_accept_tx,
     build_nft_mint_tx,
     build_batch_tx,
-    submit_batch
+    submit_batch,
 )
+from xrpl.clients import JsonRpcClient
 
 # Configuration
 RPC_URL = "https://s.altnet.rippletest.net:51234"  # XRPL testnet JSON‑RPC
-issuer_wallet = Wallet(seed="s████████████████████████████", sequence=1)
-nurse_wallet  = Wallet(seed="s████████████████████████████", sequence=1)
+issuer_wallet = Wallet.from_seed("s████████████████████████████")
+nurse_wallet  = Wallet.from_seed("s████████████████████████████")
 
 # Build inner transactions
 did_tx  = build_didset_tx(nurse_wallet.classic_address, uri="ipfs://…", fee="0")
+create_tx = build_credential_create_tx(
+    issuer=issuer_wallet.classic_address,
+    subject=nurse_wallet.classic_address,
+    credential_type_hex="6e757273655f6c6963656e7365",  # 'nurse_license' hex
+    fee="0"
+)
 cred_tx = build_credential_accept_tx(
     account=nurse_wallet.classic_address,
     issuer=issuer_wallet.classic_address,
@@ -76,11 +88,13 @@ nft_tx  = build_nft_mint_tx(
     fee="0"
 )
 
+inner_txs = [did_tx, create_tx, cred_tx, nft_tx]
 batch_tx = build_batch_tx(
     account=issuer_wallet.classic_address,
-    inner_txs=[did_tx, cred_tx, nft_tx],
+    inner_txs=inner_txs,
     mode_flag=65536,  # All or Nothing
-    fee=str(len(inner_txs) * 10)  # pay minimal fee once
+    # fee omitted: autofill computes 2 × base fee + base fee per inner
+    # transaction + base fee per BatchSigner
 )
 
 # Submit
@@ -94,53 +108,54 @@ should install it via pip (`pip install xrpl`) and ensure your accounts
 have sufficient XRP to cover reserve and fee requirements.
 """
 
+import functools
+import importlib.util
 from dataclasses import dataclass
-from typing import List, Optional
-
-try:
-    from xrpl.models.transactions import (
-        Batch,
-        NFTokenMint,
-        CredentialAccept,
-        DIDSet,
-        NFTokenMintFlag,
-    )
-    from xrpl.models.transactions import Transaction
+from typing import TYPE_CHECKING, List, Optional, Union
+
+# Only probe for xrpl‑py at import time.  Its import chain is heavy, so the
+# signing and submission helpers import it lazily; the dictionary builders
+# work without it, e.g. for static analysis, documentation or tests.
+_HAS_XRPL = importlib.util.find_spec("xrpl") is not None
+
+if TYPE_CHECKING:
     from xrpl.clients import JsonRpcClient
-    from xrpl.transaction import (safe_sign_transaction, send_reliable_submission)
+    from xrpl.models.transactions import Transaction
     from xrpl.wallet import Wallet
-    from xrpl.utils import xrp_to_drops
-except ImportError:
-    # Provide stub types if xrpl is not available.  This allows the file
-    # to be imported for static analysis and documentation without
-    # executing any network logic.  When running in production, ensure
-    # xrpl‑py is installed.
-    Batch = object
-    NFTokenMint = object
-    CredentialAccept = object
-    DIDSet = object
-    Transaction = object
-    JsonRpcClient = object
-    Wallet = object
-    NFTokenMintFlag = object
-    def safe_sign_transaction(*args, **kwargs):
-        raise RuntimeError("xrpl‑py is not available; install xrpl to use this function.")
-    def send_reliable_submission(*args, **kwargs):
+
+
+def _require_xrpl() -> None:
+    """Raise a helpful error when xrpl‑py is not installed."""
+    if not _HAS_XRPL:
         raise RuntimeError("xrpl‑py is not available; install xrpl to use this function.")
-    def xrp_to_drops(x):
-        # simple conversion fallback
-        return str(int(float(x) * 1_000_000))
 
 
-def build_didset_tx(account: str, *, uri: Optional[str] = None,
-                    data: Optional[str] = None,
-                    did_document: Optional[str] = None,
+# tfInnerBatchTxn: required on every inner transaction of a Batch.
+TF_INNER_BATCH_TXN = 0x40000000
+
+
+@functools.lru_cache(maxsize=128)
+def _hex_field(value: Union[str, bytes]) -> str:
+    """Hex‑encode a text or bytes field, caching reused values such as a
+    DID document URI shared across many nurses."""
+    if isinstance(value, str):
+        value = value.encode()
+    return value.hex()
+
+
+def build_didset_tx(account: str, *, uri: Optional[Union[str, bytes]] = None,
+                    data: Optional[Union[str, bytes]] = None,
+                    did_document: Optional[Union[str, bytes]] = None,
                     fee: str = "0") -> dict:
-    """Create an unsigned DIDSet transaction dictionary.
+    """Create an unsigned DIDSet inner transaction dictionary.
 
     At least one of `uri`, `data`, or `did_document` must be provided.  The
-    fee is expressed in drops.  Setting fee to "0" is acceptable for inner
-    transactions of a batch【800397403118925†L390-L403】.
+    result always carries `tfInnerBatchTxn`, so it is only valid inside a
+    Batch and its fee must be "0"【800397403118925†L390-L403】.
+
+    Field values may be given as text or as already encoded bytes; both are
+    hex‑encoded for the transaction payload and repeated values are served
+    from a small cache.
 
     :param account: Classic address of the account whose DID is being set.
     :param uri: URI associated with the DID (e.g. IPFS link to DID
@@ -148,8 +163,7 @@ def build_didset_tx(account: str, *, uri: Optional[str] = None,
     :param data: Optional base64‑encoded data payload.
     :param did_document: Optional DID document as a base64‑encoded
         string.
-    :param fee: Fee in drops; use "0" when this transaction is part of a
-        Batch.
+    :param fee: Fee in drops; must be "0" for an inner transaction.
     :return: JSON dictionary representing the transaction.
     """
     tx: dict = {
@@ -157,33 +171,59 @@ def build_didset_tx(account: str, *, uri: Optional[str] = None,
         "Account": account,
         "Fee": fee,
         # Note: Sequence is omitted for inner batch transactions.
-        "Flags": 0,
+        "Flags": TF_INNER_BATCH_TXN,
     }
     if uri:
-        from binascii import hexlify
-        tx["URI"] = hexlify(uri.encode()).decode()
+        tx["URI"] = _hex_field(uri)
     if data:
-        from binascii import hexlify
-        tx["Data"] = hexlify(data.encode()).decode()
+        tx["Data"] = _hex_field(data)
     if did_document:
-        from binascii import hexlify
-        tx["DIDDocument"] = hexlify(did_document.encode()).decode()
+        tx["DIDDocument"] = _hex_field(did_document)
     return tx
 
 
+def build_credential_create_tx(issuer: str, subject: str,
+                               credential_type_hex: str,
+                               *, fee: str = "0") -> dict:
+    """Create an unsigned CredentialCreate inner transaction dictionary.
+
+    The account must be the issuer of the credential (regulator).  Placing
+    this transaction ahead of the matching `CredentialAccept` in an All or
+    Nothing batch lets the provisional credential be created and accepted
+    in the same ledger【800397403118925†L261-L404】.  The result carries
+    `tfInnerBatchTxn` and cannot be submitted outside a Batch.
+
+    :param issuer: Classic address of the issuer creating the credential.
+    :param subject: Classic address of the subject the credential is for.
+    :param credential_type_hex: Hexadecimal blob identifying the credential type.
+    :param fee: Fee in drops; must be "0" for an inner transaction.
+    :return: JSON dictionary representing the transaction.
+    """
+    return {
+        "TransactionType": "CredentialCreate",
+        "Account": issuer,
+        "Subject": subject,
+        "CredentialType": credential_type_hex,
+        "Fee": fee,
+        "Flags": TF_INNER_BATCH_TXN,
+    }
+
+
 def build_credential_accept_tx(account: str, issuer: str,
                                credential_type_hex: str,
                                *, fee: str = "0") -> dict:
-    """Create an unsigned CredentialAccept transaction dictionary.
+    """Create an unsigned CredentialAccept inner transaction dictionary.
 
     The account must be the subject of the credential (nurse).  The
     credential_type_hex should be a hex‑encoded identifier matching the
     provisional credential created by the issuer【812198701817682†L259-L297】.
+    Like the other builders here, it sets `tfInnerBatchTxn`, so the result
+    is only accepted as part of a Batch.
 
     :param account: Classic address of the subject accepting the credential.
     :param issuer: Classic address of the issuer who created the credential.
     :param credential_type_hex: Hexadecimal blob identifying the credential type.
-    :param fee: Fee in drops; use "0" for inner batch transactions.
+    :param fee: Fee in drops; must be "0" for an inner transaction.
     :return: JSON dictionary representing the transaction.
     """
     return {
@@ -192,7 +232,7 @@ def build_credential_accept_tx(account: str, issuer: str,
         "Issuer": issuer,
         "CredentialType": credential_type_hex,
         "Fee": fee,
-        "Flags": 0,
+        "Flags": TF_INNER_BATCH_TXN,
     }
 
 
@@ -200,10 +240,12 @@ def build_nft_mint_tx(account: str, *, issuer: Optional[str] = None,
                        uri_hex: str, transfer_fee: Optional[int] = None,
                        taxon: int = 0, flags: int = 0,
                        fee: str = "0") -> dict:
-    """Create an unsigned NFTokenMint transaction dictionary.
+    """Create an unsigned NFTokenMint inner transaction dictionary.
 
     To make the NFT mutable, include the `tfMutable` flag (`16`) in the
     flags parameter.  To allow transfers, include `tfTransferable` (`8`)【849396272151012†L350-L357】.
+    `tfInnerBatchTxn` is always added, so the mint must be wrapped in a
+    Batch; rippled rejects it as a standalone transaction.
 
     :param account: Account funding the mint (minter or authorized minter).
     :param issuer: Optional issuer field; set to the nurse's account if minting on their behalf.
@@ -211,7 +253,8 @@ def build_nft_mint_tx(account: str, *, issuer: Optional[str] = None,
     :param transfer_fee: Optional royalty fee in basis points (1/10000 of a percent).  Must be between 0 and 50000.
     :param taxon: Arbitrary 32‑bit integer used to group NFTs; default 0.
     :param flags: Bitwise OR of NFTokenMint flags.  Use 0x00000010 for mutable and 0x00000008 for transferable.
-    :param fee: Fee in drops; use "0" when used inside a Batch.
+        `tfInnerBatchTxn` is always added.
+    :param fee: Fee in drops; must be "0" for an inner transaction.
     :return: JSON dictionary representing the transaction.
     """
     tx = {
@@ -219,7 +262,7 @@ def build_nft_mint_tx(account: str, *, issuer: Optional[str] = None,
         "Account": account,
         "NFTokenTaxon": taxon,
         "Fee": fee,
-        "Flags": flags,
+        "Flags": flags | TF_INNER_BATCH_TXN,
         "URI": uri_hex,
     }
     if issuer:
@@ -229,13 +272,63 @@ def build_nft_mint_tx(account: str, *, issuer: Optional[str] = None,
     return tx
 
 
+# tfTransferable | tfMutable: the flags used for every nurse license dNFT.
+_NURSE_NFT_FLAGS = 0x00000008 | 0x00000010
+
+
+def _make_nurse_nft_builder(transfer_fee: int = 750, taxon: int = 0,
+                            flags: int = _NURSE_NFT_FLAGS):
+    """Return an NFTokenMint inner‑transaction builder for nurse onboarding.
+
+    The deployment‑wide settings (royalty, taxon and flags) are bound once
+    so the returned builder is a branch‑free dictionary literal.  See
+    `build_nft_mint_tx` for the meaning of each field.
+    """
+    inner_flags = flags | TF_INNER_BATCH_TXN
+
+    def _build(account: str, issuer: str, uri_hex: str, fee: str = "0") -> dict:
+        return {
+            "TransactionType": "NFTokenMint",
+            "Account": account,
+            "Issuer": issuer,
+            "NFTokenTaxon": taxon,
+            "Fee": fee,
+            "Flags": inner_flags,
+            "URI": uri_hex,
+            "TransferFee": transfer_fee,
+        }
+    return _build
+
+
+# Mint a transferable, mutable nurse license dNFT with a 0.075% royalty.
+build_nurse_nft_tx = _make_nurse_nft_builder()
+
+
+def _as_inner_tx(tx: dict) -> dict:
+    """Return ``tx`` in inner batch form, copying it only when needed.
+
+    Sequence is passed through only when the caller set it; otherwise it is
+    left for autofill rather than serialized as a placeholder.
+    """
+    if tx.get("Flags", 0) & TF_INNER_BATCH_TXN and tx.get("Fee") == "0":
+        return tx
+    return {
+        **tx,
+        "Flags": tx.get("Flags", 0) | TF_INNER_BATCH_TXN,
+        "Fee": "0",
+    }
+
+
 def build_batch_tx(account: str, inner_txs: List[dict], mode_flag: int,
-                   *, fee: str) -> dict:
+                   *, fee: Optional[str] = None) -> dict:
     """Wrap a list of unsigned transactions into a Batch transaction.
 
     Each inner transaction must include the `tfInnerBatchTxn` flag (0x40000000)
-    and have its `Fee` set to "0"【800397403118925†L398-L403】.  This helper adds
-    the inner flag automatically if not present.
+    and have its `Fee` set to "0"【800397403118925†L398-L403】.  The `build_*`
+    helpers in this module already set both.  Transactions that still lack
+    the flag or a zero fee are copied with those fields filled in; complete
+    ones are wrapped as is.  No placeholder Sequence is added.  The
+    dictionaries in ``inner_txs`` are never modified.
 
     The outer batch must specify exactly one batch mode flag.  Use
     65536 (`0x00010000`) for All or Nothing, 131072 (`0x00020000`) for
@@ -245,33 +338,27 @@ def build_batch_tx(account: str, inner_txs: List[dict], mode_flag: int,
     :param account: Address paying the batch fee (issuer for onboarding flows).
     :param inner_txs: List of unsigned transaction dictionaries.
     :param mode_flag: Flag indicating the batch execution mode.
-    :param fee: Fee in drops for the outer Batch transaction.
+    :param fee: Fee in drops for the outer Batch transaction.  Leave it
+        unset to let xrpl‑py's autofill compute it: twice the base fee, plus
+        the base fee for each inner transaction and for each BatchSigner.
     :return: JSON dictionary representing the Batch transaction.
     """
-    inner_list = []
-    for tx in inner_txs:
-        # Ensure each inner transaction has tfInnerBatchTxn flag
-        # Decimal 1073741824 = 0x40000000
-        inner_flags = tx.get("Flags", 0)
-        if not (inner_flags & 0x40000000):
-            tx["Flags"] = inner_flags | 0x40000000
-        # Sequence is required; set dummy value of 1 for each.  The XRPL
-        # server will correct these when simulating or submitting the batch.
-        tx.setdefault("Sequence", 1)
-        # Ensure fee is zero
-        tx["Fee"] = "0"
-        inner_list.append({"RawTransaction": tx})
+    inner_list = [
+        {"RawTransaction": _as_inner_tx(tx)} for tx in inner_txs
+    ]
     batch_tx = {
         "TransactionType": "Batch",
         "Account": account,
         "Flags": mode_flag,
         "RawTransactions": inner_list,
-        "Fee": fee,
     }
+    if fee is not None:
+        batch_tx["Fee"] = fee
     return batch_tx
 
 
-def sign_batch(batch_tx: dict, wallets: List[Wallet], client: JsonRpcClient) -> Transaction:
+def sign_batch(batch_tx: dict, wallets: List["Wallet"],
+               client: "JsonRpcClient") -> "Transaction":
     """Sign a Batch transaction with one or more wallets.
 
     For multi‑account batches, a `BatchSigners` field must be included.  This
@@ -280,25 +367,31 @@ def sign_batch(batch_tx: dict, wallets: List[Wallet], client: JsonRpcClient) ->
     from different accounts (e.g. nurse and issuer), you must assemble
     `BatchSigners` yourself.  See XRPL documentation for details【800397403118925†L358-L376】.
 
+    An xrpl‑py `Wallet` derives its key pair once, when it is constructed
+    from a seed, and signs with the stored private key.  Reuse the same
+    Wallet instances across batches rather than rebuilding them from the
+    seed for every submission.
+
     :param batch_tx: Unsigned batch transaction dictionary.
     :param wallets: List of xrpl Wallets whose signatures are required.  The
         first wallet in the list is assumed to be the batch payer.
     :param client: JsonRpcClient instance connected to the target network.
     :return: A signed Transaction instance ready to be submitted.
     """
+    _require_xrpl()
     # Fill in Sequence, Fee, and other defaults
-    from xrpl.transaction import safe_sign_and_autofill_transaction
-    from xrpl.models import Transaction
+    from xrpl.models.transactions import Batch
+    from xrpl.transaction import autofill_and_sign
 
     # Convert to Transaction object
-    import xrpl
-    tx_obj: Transaction = xrpl.models.transactions.transaction_from_dict(batch_tx)
+    tx_obj = Batch.from_xrpl(batch_tx)
     # Sign with the first wallet
-    signed = safe_sign_and_autofill_transaction(tx_obj, wallets[0], client)
+    signed = autofill_and_sign(tx_obj, client, wallets[0])
     return signed
 
 
-def submit_batch(batch_tx: dict, wallets: List[Wallet], client: JsonRpcClient) -> dict:
+def submit_batch(batch_tx: dict, wallets: List["Wallet"],
+                 client: "JsonRpcClient") -> dict:
     """Sign and submit a batch transaction.
 
     :param batch_tx: Unsigned batch transaction dictionary.
@@ -309,5 +402,7 @@ def submit_batch(batch_tx: dict, wallets: List[Wallet], client: JsonRpcClient) -
     :return: Result dictionary from XRPL server.
     """
     signed_tx = sign_batch(batch_tx, wallets, client)
-    response = send_reliable_submission(signed_tx, client)
-    return response
+    from xrpl.transaction import submit_and_wait
+
+    response = submit_and_wait(signed_tx, client)
+    return response.result
@@ -10,7 +10,8 @@ this script after a reset will:
 
 1. Fund the issuer and nurse accounts via the network faucet.
 2. Register or update the nurse's decentralized identifier (DID).
-3. Re‑issue provisional credentials and have the nurse accept them.
+3. Re‑issue provisional credentials and have the nurse accept them in
+   the same batch.
 4. Mint a new dynamic NFT (dNFT) representing the nurse's license.
 5. Optionally issue a Multi‑purpose Token (MPT) for shift credits and
    set escrow or freeze flags.
@@ -23,6 +24,9 @@ Before running this script you must:
 
     * Install the xrpl‑py library (`pip install xrpl-py`).
 * Set environment variables for ISSUER_SEED, NURSE_SEED and RPC_URL.
+  The script talks to the node over WebSocket: RPC_URL is mapped to the
+  matching ``ws://``/``wss://`` endpoint (the public test servers' port
+  51234 becomes 51233).  Set WS_URL to use a different WebSocket endpoint.
 * Ensure the network supports the necessary amendments (DynamicNFT,
   Credentials, DID, Batch, MPTokensV1).
 
@@ -31,48 +35,80 @@ suitable for execution in an offline sandbox.  Treat it as a starting
 point for your own deployment pipelines.
 """
 
+import functools
 import os
-import time
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
 
 import requests
-from xrpl.clients import JsonRpcClient
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from xrpl.clients import WebsocketClient
 from xrpl.wallet import Wallet
-from xrpl.models.transactions import (
-    CredentialCreate,
-    CredentialAccept,
-    DIDSet,
-    NFTokenMint,
-    MPTokenIssuanceCreate,
-    MPTokenAuthorize,
-    MPTokenIssuanceSet,
-    EscrowCreate,
-    Batch,
-)
-# The xrpl‑py transaction helpers changed names in version 2.x.  We no
-# longer import them here because this script uses batch submission
-# helpers defined in batch_tx_builder.py.  If you need to sign or
-# submit individual transactions outside of batches, import
-# ``autofill_and_sign`` and ``send_reliable_submission`` from
-# ``xrpl.transaction`` where needed.
-from xrpl.transaction import send_reliable_submission  # for type hints only
-from xrpl.utils import hex_to_bytes, xrp_to_drops
-from xrpl.models.amounts import IssuedCurrencyAmount
+from xrpl.models.transactions import Batch
+from xrpl.core.binarycodec import encode
+from xrpl.models.requests import Simulate, StreamParameter, SubmitOnly, Subscribe
 from batch_tx_builder import (
     build_didset_tx,
+    build_credential_create_tx,
     build_credential_accept_tx,
-    build_nft_mint_tx,
+    build_nurse_nft_tx,
     build_batch_tx,
 )
-# Import the signing and submission helpers directly.  In xrpl‑py 2.x
-# the helper to autofill and sign a transaction is named `autofill_and_sign`.
-# We also import `send_reliable_submission` to submit the signed transaction.
+# Import the signing helper directly.  In xrpl‑py 2.x the helper to
+# autofill and sign a transaction is named `autofill_and_sign`.
 try:
     from xrpl.transaction import autofill_and_sign  # xrpl‑py >= 2.0
 except ImportError:
     # Fallback to pre‑2.x helper name
     from xrpl.transaction import safe_sign_and_autofill_transaction as autofill_and_sign  # type: ignore
-from xrpl.transaction import send_reliable_submission
+from xrpl.transaction import autofill, sign, sign_multiaccount_batch
+
+# Shared faucet session so repeated funding requests reuse the same
+# keep-alive connections instead of paying a TLS handshake each time.
+# `fund_accounts` posts from several threads at once: urllib3's connection
+# pool is thread safe and hands each concurrent request its own connection,
+# and nothing here relies on cookies or changes Session settings after
+# this setup, so only the connection pool is effectively shared.
+_FAUCET_POOL_SIZE = 8
+_FAUCET_SESSION = requests.Session()
+_FAUCET_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=_FAUCET_POOL_SIZE,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    ),
+)
+
+# Seconds without any stream message (ledgers close every few seconds)
+# before waiting for validation is abandoned.
+_STREAM_TIMEOUT = 30
+
+# `simulate` errors meaning the node cannot simulate this transaction
+# (older rippled, or a type such as Batch that it does not support).
+_SIMULATE_UNSUPPORTED = ("notImpl", "unknownCmd")
+
+# Hex encodings of constant payloads, computed once at import time.
+_NURSE_LICENSE_HEX = b"nurse_license".hex()
+_MPT_METADATA_HEX = b'{"name": "Shift Credit", "symbol": "SHIFT"}'.hex()
+# Pointer to JSON metadata conforming to nurse_dNFT_schema.json; replace
+# with the IPFS CID of the actual license metadata.
+_METADATA_URI_HEX = b"ipfs://cid-of-license-metadata".hex()
+
+
+@functools.lru_cache(maxsize=4)
+def _wallet(seed: str) -> Wallet:
+    """Return a Wallet for ``seed``, deriving its key pair only once.
+
+    Wallets are cached by seed so that repeated runs of `main()` in the
+    same process (e.g. bulk re‑provisioning after several resets) reuse
+    the already derived key pair.  Note that the cache keeps the secret
+    seeds (as keys) and wallets in memory for the life of the process, so
+    it is kept just large enough for the issuer and nurse.
+    """
+    return Wallet.from_seed(seed)
+
 
 # Backwards compatibility helper.  Some scripts still call
 # `safe_sign_and_autofill_transaction`.  Define it as an alias of
@@ -102,28 +138,141 @@ def fund_account(address: str, faucet_url: str = "https://faucet.altnet.ripplete
     :param faucet_url: URL of the testnet faucet.
     :return: Tuple of (seed, balance_drops).
     """
-    resp = requests.post(faucet_url, json={"destination": address})
+    resp = _FAUCET_SESSION.post(faucet_url, json={"destination": address}, timeout=10)
     resp.raise_for_status()
     data = resp.json()["account"]
     return data["secret"], int(data["balance"])
 
 
+def _stream_tx_result(message: dict) -> str:
+    """Return the TransactionResult of a transaction stream message."""
+    return message.get("meta", {}).get("TransactionResult") or message.get("engine_result")
+
+
+def _submit_and_await_validation(transaction: Batch, client: WebsocketClient,
+                                 wallet: Wallet) -> dict:
+    """Sign and submit a Batch, then wait until it and its inner transactions validate.
+
+    Instead of polling the node until the transaction is validated, this
+    subscribes to the transaction streams of every account in the batch and
+    to validated ledgers, then submits the blob once.  Under XLS‑56 the
+    outer Batch can succeed while inner transactions fail (and are left out
+    of the ledger), so once the outer Batch validates in ledger N we wait
+    for ledger N+1, by which point every transaction of ledger N has been
+    streamed, and require each inner hash to have validated with
+    ``tesSUCCESS``.  Arguments follow xrpl‑py's
+    `submit_and_wait(transaction, client, wallet)`.
+
+    :param transaction: Autofilled Batch model, carrying any BatchSigners.
+    :param client: Open WebSocket client; give it a timeout so a stalled
+        stream ends the wait.
+    :param wallet: Wallet of the outer Batch account, used to sign.
+    :return: The validated stream message of the outer Batch.
+    :raises RuntimeError: If the submission is rejected, the transaction
+        expires, the stream stalls, or the Batch or any inner transaction
+        validates with a result other than ``tesSUCCESS``.
+    """
+    signed_tx = sign(transaction, wallet)
+    tx_hash = signed_tx.get_hash()
+    inner_hashes = {inner.get_hash() for inner in signed_tx.raw_transactions}
+    accounts = sorted({wallet.classic_address}
+                      | {inner.account for inner in signed_tx.raw_transactions})
+    client.request(Subscribe(accounts=accounts, streams=[StreamParameter.LEDGER]))
+    submit_resp = client.request(SubmitOnly(tx_blob=encode(signed_tx.to_xrpl())))
+    result = submit_resp.result
+    if not result.get("accepted", submit_resp.is_successful()):
+        raise RuntimeError(
+            "Submission rejected: "
+            f"{result.get('engine_result') or result.get('error')}: "
+            f"{result.get('engine_result_message') or result.get('error_message')}"
+        )
+
+    outer_message = None
+    inner_results = {}
+    for message in client:
+        if message.get("type") == "ledgerClosed":
+            if (outer_message is not None
+                    and message["ledger_index"] > outer_message["ledger_index"]):
+                failed = {h: inner_results.get(h, "not applied")
+                          for h in inner_hashes
+                          if inner_results.get(h) != "tesSUCCESS"}
+                if failed:
+                    raise RuntimeError(f"Batch {tx_hash} inner transactions failed: {failed}")
+                return outer_message
+            if (outer_message is None
+                    and signed_tx.last_ledger_sequence is not None
+                    and message["ledger_index"] > signed_tx.last_ledger_sequence):
+                raise RuntimeError(f"Transaction {tx_hash} was not validated in time.")
+        elif message.get("type") == "transaction" and message.get("validated"):
+            msg_hash = message.get("hash") or message.get("transaction", {}).get("hash")
+            if msg_hash == tx_hash:
+                tx_result = _stream_tx_result(message)
+                if tx_result != "tesSUCCESS":
+                    raise RuntimeError(f"Transaction {tx_hash} failed with {tx_result}.")
+                outer_message = message
+            elif msg_hash in inner_hashes:
+                inner_results[msg_hash] = _stream_tx_result(message)
+    raise RuntimeError(
+        f"Transaction stream stalled or closed before {tx_hash} was confirmed."
+    )
+
+
+# Public XRPL test servers: JSON‑RPC on port 51234, WebSocket on 51233.
+_PUBLIC_WS_HOSTS = ("s.altnet.rippletest.net", "s.devnet.rippletest.net")
+
+
+def _websocket_url(rpc_url: str) -> str:
+    """Map a JSON‑RPC URL to the node's WebSocket endpoint.
+
+    ``https://`` becomes ``wss://`` and ``http://`` becomes ``ws://``.  The
+    port is only rewritten from 51234 to 51233 for the public altnet and
+    devnet servers; other hosts (e.g. a local rippled) keep their port, so
+    set WS_URL explicitly if their WebSocket port differs.
+    """
+    if rpc_url.startswith("https://"):
+        url = "wss://" + rpc_url[len("https://"):]
+    elif rpc_url.startswith("http://"):
+        url = "ws://" + rpc_url[len("http://"):]
+    else:
+        url = rpc_url
+    for host in _PUBLIC_WS_HOSTS:
+        url = url.replace(f"{host}:51234", f"{host}:51233")
+    return url
+
+
+def fund_accounts(*addresses: str) -> List[Tuple[str, int]]:
+    """Fund several accounts from the faucet concurrently.
+
+    Faucet requests are independent, so issuing them in parallel makes
+    the funding step take roughly as long as the slowest single request.
+    Workers share the module's faucet session; there are never more of
+    them than pooled connections.
+
+    :param addresses: Classic addresses to fund.
+    :return: List of (seed, balance_drops) tuples in the order given.
+    """
+    workers = min(max(len(addresses), 1), _FAUCET_POOL_SIZE)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(fund_account, addresses))
+
+
 def main() -> None:
     rpc_url = os.environ.get("RPC_URL", "https://s.altnet.rippletest.net:51234")
+    ws_url = os.environ.get("WS_URL") or _websocket_url(rpc_url)
     issuer_seed = os.environ.get("ISSUER_SEED")
     nurse_seed = os.environ.get("NURSE_SEED")
     if not (issuer_seed and nurse_seed):
         raise RuntimeError("Please set ISSUER_SEED and NURSE_SEED environment variables.")
 
-    client = JsonRpcClient(rpc_url)
-    issuer_wallet = Wallet(seed=issuer_seed, sequence=0)
-    nurse_wallet = Wallet(seed=nurse_seed, sequence=0)
+    issuer_wallet = _wallet(issuer_seed)
+    nurse_wallet = _wallet(nurse_seed)
 
     # 1. Optionally fund accounts.  If your seeds were used before the reset
     # they might already be funded; otherwise use the faucet.
-    # Example:
-    # fund_account(issuer_wallet.classic_address)
-    # fund_account(nurse_wallet.classic_address)
+    # Both faucet requests are issued concurrently.  Example:
+    # (issuer_secret, issuer_bal), (nurse_secret, nurse_bal) = fund_accounts(
+    #     issuer_wallet.classic_address, nurse_wallet.classic_address
+    # )
 
     # Wait for funding to be validated
     # time.sleep(4)
@@ -134,12 +283,17 @@ def main() -> None:
     did_uri = "did:xrpl:nurse12345"  # replace with actual DID document URI
     did_tx = build_didset_tx(nurse_wallet.classic_address, uri=did_uri)
 
-    # 3. Provisional credential issuance and acceptance.  In production the
-    # issuer would first submit a CredentialCreate transaction and wait
-    # until it is included in a validated ledger, then the nurse would
-    # accept it.  Here we assume the provisional credential exists and
-    # jump directly to acceptance in the batch.
-    credential_type_hex = bytes("nurse_license", "utf-8").hex()
+    # 3. Provisional credential issuance and acceptance.  Inner transactions
+    # of an All or Nothing batch execute in order, so placing the
+    # CredentialCreate ahead of the CredentialAccept lets the issuer create
+    # the credential and the nurse accept it in a single ledger round
+    # instead of waiting for the create to validate first.
+    credential_type_hex = _NURSE_LICENSE_HEX
+    cred_create_tx = build_credential_create_tx(
+        issuer=issuer_wallet.classic_address,
+        subject=nurse_wallet.classic_address,
+        credential_type_hex=credential_type_hex,
+    )
     cred_accept_tx = build_credential_accept_tx(
         account=nurse_wallet.classic_address,
         issuer=issuer_wallet.classic_address,
@@ -150,14 +304,13 @@ def main() -> None:
     # contain the IPFS hash or other pointer to JSON metadata conforming
     # to the schema in nurse_dNFT_schema.json.  It should be encoded to
     # hexadecimal for the transaction payload【564319106373646†L269-L299】.
-    metadata_ipfs = "ipfs://cid-of-license-metadata"
-    uri_hex = metadata_ipfs.encode().hex()
-    nft_tx = build_nft_mint_tx(
+    uri_hex = _METADATA_URI_HEX
+    # build_nurse_nft_tx fixes the 0.075% royalty on secondary transfers and
+    # tfTransferable | tfMutable【849396272151012†L350-L357】.
+    nft_tx = build_nurse_nft_tx(
         account=issuer_wallet.classic_address,
         issuer=nurse_wallet.classic_address,
         uri_hex=uri_hex,
-        transfer_fee=750,  # 0.075% royalty on secondary transfers
-        flags=0x00000008 | 0x00000010,  # tfTransferable | tfMutable【849396272151012†L350-L357】
     )
 
     # 5. Optionally create an MPT issuance for shift credits
@@ -168,25 +321,44 @@ def main() -> None:
         "AssetScale": 0,
         "MaximumAmount": "1000000",
         "Flags": 0x00000004 | 0x00000008 | 0x00000020,  # RequireAuth, CanEscrow, CanTransfer
-        "MPTokenMetadata": bytes("{\"name\": \"Shift Credit\", \"symbol\": \"SHIFT\"}", "utf-8").hex(),
+        "MPTokenMetadata": _MPT_METADATA_HEX,
         "Fee": "0",
         "Sequence": 1,
     }
 
     # Build batch transaction (All or Nothing mode)
-    inner_txs = [did_tx, cred_accept_tx, nft_tx]
+    inner_txs = [did_tx, cred_create_tx, cred_accept_tx, nft_tx]
     batch = build_batch_tx(
         account=issuer_wallet.classic_address,
         inner_txs=inner_txs,
         mode_flag=65536,
-        fee=str(len(inner_txs) * 10),
     )
 
-    # Sign and submit the batch transaction.  We sign the transaction
-    # with the issuer's wallet; autofill_and_sign will fill in
-    # Sequence and Fee fields.  After signing, we send it to the network.
-    signed_batch = autofill_and_sign(batch, issuer_wallet, client)
-    response = send_reliable_submission(signed_batch, client)
+    # Autofill, simulate, sign and submit the batch transaction.  The batch
+    # is converted to a model once; autofill fills in the outer and inner
+    # Sequence fields and the Batch fee (counting the nurse as the one
+    # BatchSigner), and that same object is simulated and signed.
+    # Simulation is read‑only, so a batch that would fail (missing
+    # amendment, bad fee) is rejected before we pay for submission and
+    # waiting on validation.  Nodes that cannot simulate the batch are
+    # skipped rather than treated as a failure.  The nurse signs for their
+    # inner transactions (BatchSigners) and the issuer signs the outer
+    # Batch.  A single WebSocket connection carries every request instead
+    # of one HTTPS POST each.
+    with WebsocketClient(ws_url, timeout=_STREAM_TIMEOUT) as client:
+        batch_tx = autofill(Batch.from_xrpl(batch), client, signers_count=1)
+        sim_resp = client.request(Simulate(transaction=batch_tx))
+        if sim_resp.is_successful():
+            engine_result = sim_resp.result.get("engine_result")
+            if engine_result != "tesSUCCESS":
+                raise RuntimeError(f"Batch simulation failed: {engine_result}")
+        elif sim_resp.result.get("error") not in _SIMULATE_UNSUPPORTED:
+            raise RuntimeError(
+                f"Batch simulation failed: {sim_resp.result.get('error')}: "
+                f"{sim_resp.result.get('error_message')}"
+            )
+        batch_tx = sign_multiaccount_batch(nurse_wallet, batch_tx)
+        response = _submit_and_await_validation(batch_tx, client, issuer_wallet)
     print(response)
 
 